@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import html
+import base64
 import altair as alt
 import re
 import io
+import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from PIL import Image as PILImage
 
 # PDF deps
@@ -17,8 +22,9 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.pdfgen import canvas
 from reportlab.lib.enums import TA_LEFT
 
-# Matplotlib for PDF charts
-import matplotlib.pyplot as plt
+# Matplotlib for PDF charts (object API on the Agg canvas, no pyplot state)
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.ticker import PercentFormatter
 
 
@@ -26,83 +32,189 @@ from matplotlib.ticker import PercentFormatter
 # CONFIG / CONSTANTS
 # =========================
 LOGO_URL = "https://www.revopsglobal.com/wp-content/uploads/2024/09/Footer_Logo.png"
+# Optional local copy of the logo; when present, the app never fetches LOGO_URL
+LOGO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
 SITE_URL = "https://www.revopsglobal.com/"
 CTA_URL = "https://www.revopsglobal.com/buying-group-automation/"
 
 sample_opps_url = "https://drive.google.com/file/d/11bNN1lSs6HtPyXVV0k9yYboO6XXdI85H/view?usp=sharing"
 sample_roles_url = "https://drive.google.com/file/d/1-w_yFF0_naXGUEX00TKOMDT2bAW7ehPE/view?usp=sharing"
 
+# Stage Group codes and their labels
+STAGE_GROUPS = ["Open", "Won", "Lost"]
+SG_OPEN, SG_WON, SG_LOST = 0, 1, 2
+
+# Standardized columns each upload must provide (the only ones read from the CSVs)
+REQUIRED_OPPS_COLUMNS = [
+    "Opportunity ID", "Opportunity Name", "Account ID", "Amount",
+    "Type", "Stage", "Created Date", "Close Date", "Opportunity Owner"
+]
+REQUIRED_ROLES_COLUMNS = ["Opportunity ID", "Contact ID"]
+
+# Byte-order marks that pin a CSV's encoding up front (UTF-32 before UTF-16: they share a prefix)
+CSV_BOM_ENCODINGS = [
+    (b"\x00\x00\xfe\xff", "utf-32"),
+    (b"\xff\xfe\x00\x00", "utf-32"),
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xfe\xff", "utf-16"),
+    (b"\xff\xfe", "utf-16"),
+]
+
 
 # =========================
 # HELPERS
 # =========================
-def load_csv(file):
-    for enc in ["utf-8-sig", "utf-8", "latin1", "cp1252"]:
-        try:
-            file.seek(0)
-            return pd.read_csv(file, encoding=enc)
-        except UnicodeDecodeError:
-            continue
-        except Exception:
-            continue
-    file.seek(0)
-    return pd.read_csv(file, encoding="latin1", errors="replace")
+def load_csv(data: bytes, is_roles=False):
+    # Only columns that standardize to a required name are parsed; wide exports skip the rest.
+    required = set(REQUIRED_ROLES_COLUMNS if is_roles else REQUIRED_OPPS_COLUMNS)
 
+    def usecols(col):
+        return standardize_column_name(col, is_roles) in required
 
-def normalize_and_standardize_columns(df, is_roles=False):
-    original_cols = list(df.columns)
-    col_map = {}
-
-    for col in original_cols:
-        norm = col.strip().lower()
-
-        if norm == "opportunity id":
-            col_map[col] = "Opportunity ID"
-        elif norm == "opportunity name":
-            col_map[col] = "Opportunity Name"
-        elif norm == "account id":
-            col_map[col] = "Account ID"
-        elif norm == "amount":
-            col_map[col] = "Amount"
-        elif norm == "type":
-            col_map[col] = "Type"
-        elif norm == "stage":
-            col_map[col] = "Stage"
-        elif norm in ("created date", "opportunity created date", "opportunity created"):
-            col_map[col] = "Created Date"
-        elif norm in ("closed date", "close date", "opportunity close date", "opportunity closed date"):
-            col_map[col] = "Close Date"
-        elif norm in ("opportunity owner", "owner", "owner name", "opportunity owner name"):
-            col_map[col] = "Opportunity Owner"
-
-        elif is_roles and "contact id" in norm:
-            col_map[col] = "Contact ID"
-        elif is_roles and norm == "title":
-            col_map[col] = "Title"
-        elif is_roles and ("contact role" in norm or norm == "role"):
-            col_map[col] = "Contact Role"
-        elif is_roles and ("primary" in norm or "is primary" in norm):
-            col_map[col] = "Primary"
-        else:
-            col_map[col] = col
+    # A BOM names the encoding outright, so those files are usually decoded exactly once; a body that
+    # doesn't match its BOM falls through to the chain below instead of failing the upload
+    for bom, encoding in CSV_BOM_ENCODINGS:
+        if data.startswith(bom):
+            try:
+                return read_csv_fast(data, encoding, usecols)
+            except UnicodeDecodeError:
+                break
 
-    return df.rename(columns=col_map)
+    # Without a BOM: UTF-8, then cp1252 (Windows/Excel exports, whose smart quotes and dashes latin1 would
+    # garble), then latin1, which maps every byte and so can't fail on decoding
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return read_csv_fast(data, encoding, usecols)
+        except UnicodeDecodeError:
+            pass
+    return read_csv_fast(data, "latin1", usecols)
 
 
-def parse_date(x):
+def read_csv_fast(data: bytes, encoding, usecols):
+    # pyarrow's multi-threaded reader only takes a list of column names, so resolve them from the header first
+    header = pd.read_csv(io.BytesIO(data), encoding=encoding, nrows=0).columns
     try:
-        return pd.to_datetime(x)
+        return pd.read_csv(io.BytesIO(data), encoding=encoding, usecols=[c for c in header if usecols(c)],
+                           engine="pyarrow")
+    except UnicodeDecodeError:
+        raise
     except Exception:
-        return pd.NaT
+        # e.g. the short footer rows of Salesforce report exports, which only the C parser tolerates
+        return pd.read_csv(io.BytesIO(data), encoding=encoding, usecols=usecols)
+
+
+# Normalized (stripped, lower-cased) header -> standardized column name, for both uploads
+COLUMN_ALIASES = {
+    "opportunity id": "Opportunity ID",
+    "opportunity name": "Opportunity Name",
+    "account id": "Account ID",
+    "amount": "Amount",
+    "type": "Type",
+    "stage": "Stage",
+    "created date": "Created Date",
+    "opportunity created date": "Created Date",
+    "opportunity created": "Created Date",
+    "closed date": "Close Date",
+    "close date": "Close Date",
+    "opportunity close date": "Close Date",
+    "opportunity closed date": "Close Date",
+    "opportunity owner": "Opportunity Owner",
+    "owner": "Opportunity Owner",
+    "owner name": "Opportunity Owner",
+    "opportunity owner name": "Opportunity Owner",
+}
+
+
+def standardize_column_name(col, is_roles=False):
+    norm = col.strip().lower()
+    name = COLUMN_ALIASES.get(norm)
+    if name is not None:
+        return name
+
+    # Contact Roles exports vary more, so those headers also match on substrings
+    if is_roles:
+        if "contact id" in norm:
+            return "Contact ID"
+        if norm == "title":
+            return "Title"
+        if "contact role" in norm or norm == "role":
+            return "Contact Role"
+        if "primary" in norm:
+            return "Primary"
+    return col
+
+
+def normalize_and_standardize_columns(df, is_roles=False):
+    return df.rename(columns={col: standardize_column_name(col, is_roles) for col in df.columns})
+
+
+def parse_date_series(s: pd.Series) -> pd.Series:
+    # One vectorized parse (format inferred from the column); only values that don't fit it are
+    # re-parsed one by one, so exports mixing date formats still come through as before
+    parsed = pd.to_datetime(s, errors="coerce", cache=True)
+    retry = parsed.isna() & s.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(s[retry], errors="coerce", format="mixed")
+    return parsed
 
 
 def clean_id_series(s: pd.Series) -> pd.Series:
+    # Integer IDs (the usual case for numeric exports) format cleanly: no padding, ".0" or missing values
+    if pd.api.types.is_integer_dtype(s):
+        return s.astype(str)
     s = s.astype(str).str.strip()
-    s = s.str.replace(r"\.0$", "", regex=True)
+    # Drop the ".0" a float-inferred column leaves behind, with a plain suffix check instead of a regex
+    float_suffix = s.str.endswith(".0")
+    if float_suffix.any():
+        s = s.where(~float_suffix, s.str[:-2])
     s = s.replace({"nan": "", "None": ""})
     return s
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def prepare_inputs(opps_bytes: bytes, roles_bytes: bytes):
+    # Parsing, column mapping, ID cleaning, date parsing and contact counts only depend on the uploaded files,
+    # so they run once per upload rather than on every widget interaction.
+    opps = normalize_and_standardize_columns(load_csv(opps_bytes, is_roles=False), is_roles=False)
+    roles = normalize_and_standardize_columns(load_csv(roles_bytes, is_roles=True), is_roles=True)
+
+    missing_opps = [c for c in REQUIRED_OPPS_COLUMNS if c not in opps.columns]
+    missing_roles = [c for c in REQUIRED_ROLES_COLUMNS if c not in roles.columns]
+    if missing_opps or missing_roles:
+        return opps, missing_opps, missing_roles
+
+    opps["Opportunity ID"] = clean_id_series(opps["Opportunity ID"])
+    # One row per opportunity (first occurrence wins), so per-opportunity counts below are plain row counts
+    opps = opps[opps["Opportunity ID"] != ""].drop_duplicates(subset="Opportunity ID")
+
+    roles["Opportunity ID"] = clean_id_series(roles["Opportunity ID"])
+    roles["Contact ID"] = clean_id_series(roles["Contact ID"])
+    roles = roles[(roles["Opportunity ID"] != "") & (roles["Contact ID"] != "")].copy()
+
+    opps["Amount"] = pd.to_numeric(opps["Amount"], errors="coerce").fillna(0)
+    opps["Created Date"] = parse_date_series(opps["Created Date"])
+    opps["Close Date"] = parse_date_series(opps["Close Date"])
+    # Low-cardinality labels as categoricals: filters and per-stage lookups work on the integer codes
+    opps["Type"] = opps["Type"].fillna("").astype(str).astype("category")
+    opps["Stage"] = opps["Stage"].fillna("").astype(str).astype("category")
+    opps["Opportunity Owner"] = opps["Opportunity Owner"].fillna("").astype(str).str.strip().astype("category")
+
+    # CONTACT COUNTS
+    # Per-opportunity counts don't depend on which other opps the Type/Amount filters keep, so they are
+    # computed here once per upload and simply travel with the filtered rows.
+    cr_counts = roles.drop_duplicates(["Opportunity ID", "Contact ID"]).groupby("Opportunity ID").size()
+    opps["contact_count"] = opps["Opportunity ID"].map(cr_counts).fillna(0).astype("int32")
+
+    # st.cache_data unpickles this frame on every rerun: arrow-backed IDs and a categorical Account ID
+    # load from contiguous buffers instead of rebuilding one Python str per cell
+    opps["Opportunity ID"] = opps["Opportunity ID"].astype("string[pyarrow]")
+    opps["Account ID"] = opps["Account ID"].astype("category")
+
+    # roles isn't returned: everything downstream reads contact_count, and st.cache_data would otherwise
+    # copy the whole roles frame out of the cache on every rerun
+    return opps, missing_opps, missing_roles
+
+
 def fmt_money(x):
     try:
         if pd.isna(x):
@@ -113,106 +225,278 @@ def fmt_money(x):
         return "$0"
 
 
-def label_with_tooltip(label: str, tooltip: str):
+def kpi_label_html(label: str, tooltip: str) -> str:
     safe_tip = html.escape(tooltip)
-    st.markdown(
-        f"""
-        <div class="tooltip-wrap">
-          <span class="kpi-label">{label}</span>
-          <span class="tooltip-icon">ℹ️
-            <span class="tooltip-text">{safe_tip}</span>
-          </span>
-        </div>
-        """,
-        unsafe_allow_html=True
+    return (
+        f'<div class="tooltip-wrap"><span class="kpi-label">{label}</span>'
+        f'<span class="tooltip-icon">ℹ️<span class="tooltip-text">{safe_tip}</span></span></div>'
     )
 
 
-def show_value(value: str):
-    st.markdown(f"<div class='kpi-value'>{value}</div>", unsafe_allow_html=True)
+def kpi_html(label: str, tooltip: str, value: str) -> str:
+    return f'<div class="kpi">{kpi_label_html(label, tooltip)}<div class="kpi-value">{value}</div></div>'
 
 
-def section_start(title: str):
-    st.markdown(
-        f"""
+def show_kpis(kpis):
+    # One markdown element per KPI group instead of two per KPI, so reruns ship far fewer deltas
+    st.markdown("".join(kpi_html(*k) for k in kpis), unsafe_allow_html=True)
+
+
+def section_header_html(title: str) -> str:
+    return f"""
         <div class="section-card">
           <div class="section-title">{html.escape(title)}</div>
           <div class="section-divider"></div>
-        """,
-        unsafe_allow_html=True
-    )
+        """
+
+
+def section_start(title: str):
+    st.markdown(section_header_html(title), unsafe_allow_html=True)
 
 
 def section_end():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
-def wilson_ci(k, n, z=1.96):
-    if n == 0:
-        return (0.0, 0.0)
-    p = k / n
-    denom = 1 + z**2 / n
-    center = (p + z**2/(2*n)) / denom
-    margin = (z * ((p*(1-p)/n + z**2/(4*n**2))**0.5)) / denom
-    return (max(0.0, center - margin), min(1.0, center + margin))
+def wilson_ci_vec(k, n, z=1.96):
+    # Wilson score interval over per-group won/total counts; groups with n == 0 get (0, 0)
+    k = np.asarray(k, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    has_n = n > 0
+    n_safe = np.where(has_n, n, 1.0)
+    p = k / n_safe
+    denom = 1 + z**2 / n_safe
+    center = (p + z**2 / (2 * n_safe)) / denom
+    margin = (z * np.sqrt(p * (1 - p) / n_safe + z**2 / (4 * n_safe**2))) / denom
+    lo = np.where(has_n, np.maximum(0.0, center - margin), 0.0)
+    hi = np.where(has_n, np.minimum(1.0, center + margin), 0.0)
+    return lo, hi
+
+
+# Seniority tiers in priority order (first match wins)
+SENIORITY_TIERS = [
+    ("C-Level", r"\b(chief|ceo|cfo|coo|cto|cio|cmo|cro|cso|cpo|founder|co-founder|president)\b"),
+    ("EVP / SVP", r"\b(evp|svp|executive vice president|senior vice president)\b"),
+    ("VP", r"\b(vp|vice president)\b"),
+    ("Director / Head", r"\b(director|head of|chief of staff|gm|general manager)\b"),
+    ("Manager", r"\b(manager|lead|supervisor)\b"),
+    ("IC / Staff", r"\b(analyst|engineer|specialist|consultant|associate|coordinator|administrator|rep|developer|designer|architect|scientist|strategist|officer)\b"),
+]
+# One compiled regex for all tiers: each alternative is an anchored lookahead, so alternatives are tried in
+# tier order (not leftmost-match order) and the named group that matched identifies the tier.
+SENIORITY_RE = re.compile(
+    "|".join(rf"(?=.*?(?P<tier{i}>{pattern}))" for i, (_, pattern) in enumerate(SENIORITY_TIERS)),
+    re.DOTALL
+)
+SENIORITY_LABELS = {f"tier{i}": label for i, (label, _) in enumerate(SENIORITY_TIERS)}
 
 
 def bucket_seniority(title: str) -> str:
     if not isinstance(title, str) or title.strip() == "":
         return "Other / Unknown"
-    t = title.lower()
-
-    if re.search(r"\b(chief|ceo|cfo|coo|cto|cio|cmo|cro|cso|cpo|founder|co-founder|president)\b", t):
-        return "C-Level"
-    if re.search(r"\b(evp|svp|executive vice president|senior vice president)\b", t):
-        return "EVP / SVP"
-    if re.search(r"\b(vp|vice president)\b", t):
-        return "VP"
-    if re.search(r"\b(director|head of|chief of staff|gm|general manager)\b", t):
-        return "Director / Head"
-    if re.search(r"\b(manager|lead|supervisor)\b", t):
-        return "Manager"
-    if re.search(r"\b(analyst|engineer|specialist|consultant|associate|coordinator|administrator|rep|developer|designer|architect|scientist|strategist|officer)\b", t):
-        return "IC / Staff"
-
-    return "Other / Unknown"
+    m = SENIORITY_RE.match(title.lower())
+    return SENIORITY_LABELS[m.lastgroup] if m else "Other / Unknown"
 
 
 # PDF helpers
-def fetch_logo_bytes(url: str):
+@st.cache_resource(show_spinner=False)
+def http_session():
+    # One keep-alive session per server process, so repeat fetches skip the TCP/TLS handshake
+    return requests.Session()
+
+
+@st.cache_resource(show_spinner=False, ttl=3600)
+def fetch_logo_content(url: str):
+    # Shared across reruns and sessions; a failed fetch is cached too (as None) so an unreachable
+    # host doesn't add a timeout to every rerun, and is retried once the hour is up
+    if os.path.isfile(LOGO_FILE):
+        with open(LOGO_FILE, "rb") as f:
+            return f.read()
     try:
-        r = requests.get(url, timeout=10)
+        r = http_session().get(url, timeout=10)
         r.raise_for_status()
-        return io.BytesIO(r.content)
+        return r.content
+    except Exception:
+        return None
+
+
+@st.cache_resource(show_spinner=False, ttl=3600)
+def logo_pixel_size(url: str):
+    # Decoded once per cached logo rather than on every PDF build; None if there's no usable image
+    content = fetch_logo_content(url)
+    if not content:
+        return None
+    try:
+        return PILImage.open(io.BytesIO(content)).size
     except Exception:
         return None
 
 
+def fetch_logo_bytes(url: str):
+    content = fetch_logo_content(url)
+    return io.BytesIO(content) if content else None
+
+
+def logo_img_src(url: str) -> str:
+    # Inline the cached logo as a data URI so the page header doesn't make the browser fetch it again
+    content = fetch_logo_content(url)
+    if not content:
+        return url
+    return "data:image/png;base64," + base64.b64encode(content).decode("ascii")
+
+
 def pdf_watermark_and_footer(c: canvas.Canvas, doc):
-    c.saveState()
-    c.setFont("Helvetica-Bold", 50)
-    c.setFillColor(colors.HexColor("#E6EAF0"))
-    c.translate(300, 400)
-    c.rotate(30)
-    c.drawCentredString(0, 0, "RevOps Global")
-    c.restoreState()
-
-    c.saveState()
-    c.setFont("Helvetica", 9)
-    c.setFillColor(colors.grey)
-    footer_text = f"© {datetime.now().year} RevOps Global. All rights reserved."
-    c.drawCentredString(letter[0] / 2, 0.5 * inch, footer_text)
-    c.restoreState()
+    # Watermark and footer are identical on every page: draw them once per document into a form XObject,
+    # then each page references it with a single Do operator instead of repeating the drawing
+    if not c.hasForm("watermark_footer"):
+        c.beginForm("watermark_footer")
+        c.saveState()
+        c.setFont("Helvetica-Bold", 50)
+        c.setFillColor(colors.HexColor("#E6EAF0"))
+        c.translate(300, 400)
+        c.rotate(30)
+        c.drawCentredString(0, 0, "RevOps Global")
+        c.restoreState()
+
+        c.saveState()
+        c.setFont("Helvetica", 9)
+        c.setFillColor(colors.grey)
+        footer_text = f"© {datetime.now().year} RevOps Global. All rights reserved."
+        c.drawCentredString(letter[0] / 2, 0.5 * inch, footer_text)
+        c.restoreState()
+        c.endForm()
+    c.doForm("watermark_footer")
 
 
 def fig_to_png_bytes(fig):
+    # The figure is already sized to its PDF slot, so it saves in one render pass: no tight-bbox pre-pass,
+    # and 130 dpi is still sharp at that print size
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=180, bbox_inches="tight")
-    plt.close(fig)
+    fig.savefig(buf, format="png", dpi=130)
+    fig.clear()
     buf.seek(0)
     return buf
 
 
+def render_chart_png(draw, figsize=(6.7, 3.2)):
+    # Each chart gets its own Figure/Agg canvas so renders can run on separate threads.
+    # figsize matches the Image slot in build_pdf_report; constrained layout keeps labels inside it.
+    fig = Figure(figsize=figsize, layout="constrained")
+    FigureCanvasAgg(fig)
+    draw(fig.add_subplot())
+    return fig_to_png_bytes(fig)
+
+
+def xy_arrays(labels, values):
+    # (category labels, float64 values) pair that both the PDF charts and the cache key work on directly
+    return [str(x) for x in labels], np.asarray(values, dtype=np.float64)
+
+
+def pdf_chart_series(winrate_bucket, open_pipeline_bucket, funnel_counts, avg_days_bucket, stage_health):
+    # Reduce the (already aggregated) chart frames to plain label/value arrays once; matplotlib plots
+    # them as-is, and st.cache_data hashes a few short arrays instead of whole DataFrames
+    return {
+        "winrate": xy_arrays(winrate_bucket["Winrate Bucket"], winrate_bucket["Win Rate"]),
+        "open_pipeline": xy_arrays(open_pipeline_bucket["Open Coverage Bucket"], open_pipeline_bucket["Open Pipeline"]),
+        "funnel": xy_arrays(funnel_counts["Coverage Funnel Bucket"], funnel_counts["Open Opps"]),
+        "velocity": {
+            sg: xy_arrays(sub["Contact Bucket"], sub["Avg Days"])
+            for sg, sub in avg_days_bucket.groupby("Stage Group", sort=False)
+        },
+        "stage_health": xy_arrays(stage_health.index, stage_health.values),
+    }
+
+
+def draw_winrate_chart(ax, winrate):
+    ax.plot(*winrate, marker="o")
+    ax.yaxis.set_major_formatter(PercentFormatter(1.0))
+    ax.set_title("Win rate by Contact Roles")
+    ax.set_xlabel("Contact Roles per Opportunity")
+    ax.set_ylabel("Win Rate")
+
+
+def draw_open_pipeline_chart(ax, open_pipeline):
+    ax.bar(*open_pipeline)
+    ax.set_title("Open Pipeline by Coverage Bucket")
+    ax.set_xlabel("Coverage Bucket")
+    ax.set_ylabel("Pipeline ($)")
+
+
+def draw_funnel_chart(ax, funnel):
+    ax.barh(*funnel)
+    ax.set_title("Open Opportunities Coverage Funnel")
+    ax.set_xlabel("# Open Opps")
+
+
+def draw_velocity_chart(ax, velocity):
+    for sg, (buckets, avg_days) in velocity.items():
+        ax.plot(buckets, avg_days, marker="o", label=sg)
+    ax.set_title("Time to Close vs Contact Roles")
+    ax.set_xlabel("Contact Roles Bucket")
+    ax.set_ylabel("Avg Days")
+    ax.legend()
+
+
+def draw_stage_health_chart(ax, stage_health):
+    ax.bar(*stage_health)
+    ax.yaxis.set_major_formatter(PercentFormatter(1.0))
+    ax.set_title("Avg Coverage Health by Stage Bucket")
+    ax.set_ylabel("% with 2+ roles")
+
+
+def render_pdf_charts(winrate, open_pipeline, funnel, velocity, stage_health):
+    # Charts only read small label/value arrays, so they render independently in parallel.
+    # Threads rather than processes: every chart has its own Figure/Agg canvas (no pyplot state),
+    # Agg releases the GIL while rasterizing/encoding, and Streamlit runs this script as __main__,
+    # which spawn-started worker processes can't re-import.
+    chart_draws = [
+        partial(draw_winrate_chart, winrate=winrate),
+        partial(draw_open_pipeline_chart, open_pipeline=open_pipeline),
+        partial(draw_funnel_chart, funnel=funnel),
+        partial(draw_velocity_chart, velocity=velocity),
+        partial(draw_stage_health_chart, stage_health=stage_health),
+    ]
+    with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(chart_draws))) as pool:
+        return list(pool.map(render_chart_png, chart_draws))
+
+
+@st.cache_resource(show_spinner=False)
+def pdf_styles():
+    # Paragraph and table styles are read-only during a build, so one shared set serves every PDF.
+    # Cached as a resource: app.py re-executes on each rerun, so plain module globals would be rebuilt.
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="H1", fontSize=18, leading=22, spaceAfter=10, alignment=TA_LEFT))
+    styles.add(ParagraphStyle(name="H2", fontSize=13, leading=16, spaceBefore=8, spaceAfter=6,
+                              textColor=colors.HexColor("#0F172A")))
+    styles.add(ParagraphStyle(name="Body", fontSize=10.5, leading=14))
+    styles.add(ParagraphStyle(name="Small", fontSize=9.5, leading=12, textColor=colors.grey))
+
+    metrics_table_style = TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#F1F5F9")),
+        ("TEXTCOLOR", (0,0), (-1,0), colors.HexColor("#0F172A")),
+        ("FONTNAME", (0,0), (-1,-1), "Helvetica-Bold"),
+        ("GRID", (0,0), (-1,-1), 0.5, colors.HexColor("#E2E8F0")),
+        ("ALIGN", (1,1), (1,-1), "RIGHT"),
+        ("FONTSIZE", (0,0), (-1,-1), 10),
+    ])
+
+    rows_table_style = TableStyle([
+        ("LINEBELOW", (0,0), (-1,-2), 0.25, colors.HexColor("#E2E8F0")),
+        ("LEFTPADDING", (0,0), (-1,-1), 0),
+        ("RIGHTPADDING", (0,0), (-1,-1), 0),
+        ("TOPPADDING", (0,0), (-1,-1), 2),
+        ("BOTTOMPADDING", (0,0), (-1,-1), 2),
+    ])
+    return styles, metrics_table_style, rows_table_style
+
+
+def rows_table(rows, style, table_style):
+    # Row lists go into one fixed-width Table instead of a flowable per row: one layout pass for the
+    # whole section, with Paragraph cells so long rows still wrap
+    return Table([[Paragraph(f"• {html.escape(r)}", style)] for r in rows], colWidths=[6.8*inch],
+                 style=table_style)
+
+
 def build_pdf_report(
     metrics_dict,
     bullets,
@@ -232,23 +516,17 @@ def build_pdf_report(
         bottomMargin=0.75*inch
     )
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="H1", fontSize=18, leading=22, spaceAfter=10, alignment=TA_LEFT))
-    styles.add(ParagraphStyle(name="H2", fontSize=13, leading=16, spaceBefore=8, spaceAfter=6,
-                              textColor=colors.HexColor("#0F172A")))
-    styles.add(ParagraphStyle(name="Body", fontSize=10.5, leading=14))
-    styles.add(ParagraphStyle(name="Small", fontSize=9.5, leading=12, textColor=colors.grey))
+    styles, metrics_table_style, rows_table_style = pdf_styles()
 
     story = []
     logo_bytes = fetch_logo_bytes(LOGO_URL)
-    if logo_bytes:
+    logo_size = logo_pixel_size(LOGO_URL)
+    if logo_bytes and logo_size:
         try:
-            pil_img = PILImage.open(logo_bytes)
-            w, h = pil_img.size
+            w, h = logo_size
             aspect = h / w
             img_width = 2.2 * inch
             img_height = img_width * aspect
-            logo_bytes.seek(0)
             story.append(Image(logo_bytes, width=img_width, height=img_height))
             story.append(Spacer(1, 0.15*inch))
         except Exception:
@@ -260,53 +538,44 @@ def build_pdf_report(
 
     for section_title, rows in metrics_dict.items():
         story.append(Paragraph(section_title, styles["H2"]))
-        table_data = [["Metric", "Value"]] + rows
-        t = Table(table_data, colWidths=[3.7*inch, 2.7*inch])
-        t.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#F1F5F9")),
-            ("TEXTCOLOR", (0,0), (-1,0), colors.HexColor("#0F172A")),
-            ("FONTNAME", (0,0), (-1,-1), "Helvetica-Bold"),
-            ("GRID", (0,0), (-1,-1), 0.5, colors.HexColor("#E2E8F0")),
-            ("ALIGN", (1,1), (1,-1), "RIGHT"),
-            ("FONTSIZE", (0,0), (-1,-1), 10),
-        ]))
-        story.append(t)
+        # Rows arrive as preformatted strings; repeatRows keeps the header on a table split across pages
+        story.append(Table([("Metric", "Value"), *rows], colWidths=[3.7*inch, 2.7*inch], repeatRows=1,
+                           style=metrics_table_style))
         story.append(Spacer(1, 0.12*inch))
 
+    # Consecutive Body lines are one Paragraph joined with <br/>: same leading, one flowable to wrap
     story.append(Paragraph("Executive Summary", styles["H2"]))
-    for b in bullets:
-        story.append(Paragraph(f"• {html.escape(b)}", styles["Body"]))
+    if bullets:
+        story.append(Paragraph("<br/>".join(f"• {html.escape(b)}" for b in bullets), styles["Body"]))
     story.append(Spacer(1, 0.12*inch))
 
     story.append(Paragraph("Recommended Enhancements", styles["H2"]))
     for h, body in enhancements:
-        story.append(Paragraph(f"• {html.escape(h)}", styles["Body"]))
-        story.append(Paragraph(html.escape(body), styles["Body"]))
+        story.append(Paragraph(f"• {html.escape(h)}<br/>{html.escape(body)}", styles["Body"]))
         story.append(Spacer(1, 0.06*inch))
     story.append(Spacer(1, 0.1*inch))
 
     if won_zero_rows:
         story.append(Paragraph("Won Deals Missing Contact Roles (Red Flag)", styles["H2"]))
-        for r in won_zero_rows:
-            story.append(Paragraph(f"• {html.escape(r)}", styles["Body"]))
+        story.append(rows_table(won_zero_rows, styles["Body"], rows_table_style))
         story.append(Spacer(1, 0.12*inch))
 
     if owner_bullets:
         story.append(Paragraph("Owner Coverage Rollup (Coaching View)", styles["H2"]))
-        for r in owner_bullets:
-            story.append(Paragraph(f"• {html.escape(r)}", styles["Body"]))
+        story.append(rows_table(owner_bullets, styles["Body"], rows_table_style))
         story.append(Spacer(1, 0.12*inch))
 
     if priority_bullets:
         story.append(Paragraph("Top Open Opportunities to Fix First", styles["H2"]))
-        for r in priority_bullets:
-            story.append(Paragraph(f"• {html.escape(r)}", styles["Body"]))
+        story.append(rows_table(priority_bullets, styles["Body"], rows_table_style))
         story.append(Spacer(1, 0.12*inch))
 
     story.append(Paragraph("Insights", styles["H2"]))
     story.append(Spacer(1, 0.1*inch))
     for i, png_buf in enumerate(chart_pngs, start=1):
-        story.append(Image(png_buf, width=6.7*inch, height=3.2*inch))
+        # lazy=2: each PNG is decoded only while its page is drawn and released right after,
+        # so at most one decoded chart bitmap is held during doc.build
+        story.append(Image(png_buf, width=6.7*inch, height=3.2*inch, lazy=2))
         story.append(Spacer(1, 0.15*inch))
         if i in (2, 4):
             story.append(PageBreak())
@@ -319,10 +588,31 @@ def build_pdf_report(
     story.append(Paragraph(f"Learn more: {CTA_URL}", styles["Body"]))
 
     doc.build(story, onFirstPage=pdf_watermark_and_footer, onLaterPages=pdf_watermark_and_footer)
-    buffer.seek(0)
+    # getvalue() hands back BytesIO's own buffer (no copy while nothing else references it)
     return buffer.getvalue()
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def make_pdf_report(
+    metrics_dict,
+    bullets,
+    enhancements,
+    chart_data,
+    won_zero_rows,
+    owner_bullets,
+    priority_bullets
+):
+    return build_pdf_report(
+        metrics_dict=metrics_dict,
+        bullets=bullets,
+        enhancements=enhancements,
+        chart_pngs=render_pdf_charts(**chart_data),
+        won_zero_rows=won_zero_rows,
+        owner_bullets=owner_bullets,
+        priority_bullets=priority_bullets
+    )
+
+
 # =========================
 # APP UI
 # =========================
@@ -332,7 +622,7 @@ st.markdown(
     f"""
     <div style="margin-top:4px;">
       <a href="{SITE_URL}" target="_blank">
-        <img src="{LOGO_URL}" style="height:90px;" />
+        <img src="{logo_img_src(LOGO_URL)}" style="height:90px;" />
       </a>
     </div>
     <div style="height:18px;"></div>
@@ -363,6 +653,8 @@ st.markdown("""
 }
 .kpi-label { font-size:16px; font-weight:600; }
 .kpi-value { font-size:20px; font-weight:700; margin:4px 0 14px 0; }
+.kpi { margin-bottom:16px; }
+.kpi .kpi-value { margin-top:20px; }
 
 .section-card{
   background: var(--card-bg);
@@ -463,20 +755,7 @@ roles_file = st.file_uploader("", type=["csv"], key="roles")
 # MAIN LOGIC
 # =========================
 if opps_file and roles_file:
-    raw_opps = load_csv(opps_file)
-    raw_roles = load_csv(roles_file)
-
-    opps = normalize_and_standardize_columns(raw_opps, is_roles=False)
-    roles = normalize_and_standardize_columns(raw_roles, is_roles=True)
-
-    required_opps = [
-        "Opportunity ID", "Opportunity Name", "Account ID", "Amount",
-        "Type", "Stage", "Created Date", "Close Date", "Opportunity Owner"
-    ]
-    required_roles = ["Opportunity ID", "Contact ID"]
-
-    missing_opps = [c for c in required_opps if c not in opps.columns]
-    missing_roles = [c for c in required_roles if c not in roles.columns]
+    opps, missing_opps, missing_roles = prepare_inputs(opps_file.getvalue(), roles_file.getvalue())
 
     if missing_opps:
         st.error("Opportunities file missing columns: " + ", ".join(missing_opps))
@@ -485,19 +764,6 @@ if opps_file and roles_file:
         st.error("Contact Roles file missing columns: " + ", ".join(missing_roles))
         st.stop()
 
-    opps["Opportunity ID"] = clean_id_series(opps["Opportunity ID"])
-    opps = opps[opps["Opportunity ID"] != ""].copy()
-
-    roles["Opportunity ID"] = clean_id_series(roles["Opportunity ID"])
-    roles["Contact ID"] = clean_id_series(roles["Contact ID"])
-    roles = roles[(roles["Opportunity ID"] != "") & (roles["Contact ID"] != "")].copy()
-
-    opps["Amount"] = pd.to_numeric(opps["Amount"], errors="coerce").fillna(0)
-    opps["Created Date"] = opps["Created Date"].apply(parse_date)
-    opps["Close Date"] = opps["Close Date"].apply(parse_date)
-    opps["Type"] = opps["Type"].fillna("").astype(str)
-    opps["Stage"] = opps["Stage"].fillna("").astype(str)
-
     # GLOBAL TYPE FILTER
     all_types = sorted([t for t in opps["Type"].dropna().unique().tolist() if str(t).strip() != ""])
     section_start("Global Filter — Opportunity Type")
@@ -515,22 +781,27 @@ if opps_file and roles_file:
     section_end()
 
     if selected_types:
-        opps = opps[opps["Type"].isin(selected_types)].copy()
+        opps = opps[opps["Type"].isin(selected_types)]
     if exclude_non_positive:
-        opps = opps[opps["Amount"] > 0].copy()
+        opps = opps[opps["Amount"] > 0]
 
+    # reset_index returns a fresh frame, so the filtered slices above need no copies of their own
     opps = opps.reset_index(drop=True)
 
-    filtered_opp_ids = set(opps["Opportunity ID"].unique())
-    roles = roles[roles["Opportunity ID"].isin(filtered_opp_ids)].copy()
-
-    if roles.empty:
+    # contact_count > 0 exactly when an opp has rows in the roles file, so this needs no ID join
+    if not (opps["contact_count"] > 0).any():
         st.warning(
             "⚠️ Contact Roles file has **0 matching Opportunity IDs** after filtering. "
             "Please ensure both CSVs are exported from the same CRM scope/time window."
         )
 
-    stage = opps["Stage"].astype(str)
+    stage = opps["Stage"]
+    # Stage names repeat heavily, so everything stage-derived is decided once per distinct stage
+    # and broadcast to rows through the categorical codes. Names are lowercased once here and shared by
+    # the Won/Lost suggestions, the unmapped fallback and the bucket helper.
+    stage_names = stage.cat.categories
+    stage_codes = stage.cat.codes.to_numpy()
+    stage_lower = dict(zip(stage_names, stage_names.str.lower()))
 
     # ======================================================
     # Bucket Opportunities Stages
@@ -539,50 +810,42 @@ if opps_file and roles_file:
     st.caption("Map your CRM stages into buckets so all analysis and gates apply correctly.")
 
     stage_values = sorted([s for s in stage.dropna().unique().tolist() if str(s).strip() != ""])
-    suggested_won  = [s for s in stage_values if "won" in str(s).lower()]
-    suggested_lost = [s for s in stage_values if "lost" in str(s).lower()]
+    suggested_won  = [s for s in stage_values if "won" in stage_lower[s]]
+    suggested_lost = [s for s in stage_values if "lost" in stage_lower[s]]
 
     col1, col2 = st.columns(2)
     with col1:
         won_stages = st.multiselect("Won stages", options=stage_values, default=suggested_won)
         lost_stages = st.multiselect("Lost stages", options=stage_values, default=suggested_lost)
 
-    used = set(won_stages + lost_stages)
-    remaining2 = [s for s in stage_values if s not in used]
+    # One running set of assigned stages; each later picker only offers what's still unassigned
+    assigned = set(won_stages)
+    assigned.update(lost_stages)
 
     with col2:
-        early_stages = st.multiselect("Early stages", options=remaining2, default=[])
-        used2 = used.union(set(early_stages))
-        remaining3 = [s for s in stage_values if s not in used2]
+        early_stages = st.multiselect("Early stages", options=[s for s in stage_values if s not in assigned], default=[])
+        assigned.update(early_stages)
 
-        mid_stages = st.multiselect("Mid stages", options=remaining3, default=[])
-        used3 = used2.union(set(mid_stages))
-        remaining4 = [s for s in stage_values if s not in used3]
+        mid_stages = st.multiselect("Mid stages", options=[s for s in stage_values if s not in assigned], default=[])
+        assigned.update(mid_stages)
 
-        late_stages = st.multiselect("Late stages", options=remaining4, default=[])
+        late_stages = st.multiselect("Late stages", options=[s for s in stage_values if s not in assigned], default=[])
 
     user_mapped_any = any([early_stages, mid_stages, late_stages, won_stages, lost_stages])
     section_end()
 
     if user_mapped_any:
-        won_mask = stage.isin(won_stages)
-        lost_mask = stage.isin(lost_stages)
-        open_mask = ~(won_mask | lost_mask)
+        won_by_stage = stage_names.isin(won_stages)
+        lost_by_stage = stage_names.isin(lost_stages)
     else:
-        won_mask = stage.str.contains("Won", case=False, na=False)
-        lost_mask = stage.str.contains("Lost", case=False, na=False)
-        open_mask = ~(won_mask | lost_mask)
-
-    # CONTACT COUNTS
-    cr_counts = roles.groupby("Opportunity ID")["Contact ID"].nunique()
-    opps = opps.merge(cr_counts.rename("contact_count"), on="Opportunity ID", how="left")
-    opps["contact_count"] = pd.to_numeric(opps["contact_count"], errors="coerce").fillna(0)
+        won_by_stage = np.array(["won" in stage_lower[s] for s in stage_names], dtype=bool)
+        lost_by_stage = np.array(["lost" in stage_lower[s] for s in stage_names], dtype=bool)
+    won_mask = pd.Series(won_by_stage[stage_codes], index=stage.index)
+    lost_mask = pd.Series(lost_by_stage[stage_codes], index=stage.index)
+    open_mask = ~(won_mask | lost_mask)
 
     # Stage bucket helper
-    stage_lookup = opps.set_index("Opportunity ID")["Stage"].to_dict()
-
-    def stage_bucket_for_id(opp_id):
-        s = stage_lookup.get(opp_id, "")
+    def stage_bucket_for_stage(s):
         if user_mapped_any:
             if s in won_stages: return "Won"
             if s in lost_stages: return "Lost"
@@ -590,69 +853,68 @@ if opps_file and roles_file:
             if s in mid_stages: return "Mid"
             if s in early_stages: return "Early"
             return "Open"
-        sl = str(s).lower()
+        sl = stage_lower[s]
         if "won" in sl: return "Won"
         if "lost" in sl: return "Lost"
         return "Open"
 
-    opps["Stage Bucket"] = opps["Opportunity ID"].apply(stage_bucket_for_id)
+    bucket_by_stage = np.array([stage_bucket_for_stage(s) for s in stage_names], dtype=object)
+    opps["Stage Bucket"] = bucket_by_stage[stage_codes]
 
     # ======================================================
     # BASIC SPLITS
     # ======================================================
-    total_opps = opps["Opportunity ID"].nunique()
+    # opps holds one row per Opportunity ID (deduped on load), so counts below are row counts / mask sums
+    total_opps = len(opps)
     total_pipeline = opps["Amount"].sum()
-    opps_with_cr_ids = set(roles["Opportunity ID"].dropna().unique())
-    opps_with_cr = opps[opps["Opportunity ID"].isin(opps_with_cr_ids)]["Opportunity ID"].nunique()
+    # contact_count > 0 exactly when the opp appears in the roles file
+    has_cr = opps["contact_count"] > 0
+    one_cr = opps["contact_count"] == 1
+    opps_with_cr = int(has_cr.sum())
     opps_without_cr = total_opps - opps_with_cr
-    pipeline_with_cr = opps[opps["Opportunity ID"].isin(opps_with_cr_ids)]["Amount"].sum()
+    pipeline_with_cr = opps.loc[has_cr, "Amount"].sum()
     pipeline_without_cr = total_pipeline - pipeline_with_cr
-    one_cr_ids = cr_counts[cr_counts == 1].index
-    opps_one_cr = opps[opps["Opportunity ID"].isin(one_cr_ids)]["Opportunity ID"].nunique()
-    pipeline_one_cr = opps[opps["Opportunity ID"].isin(one_cr_ids)]["Amount"].sum()
+    opps_one_cr = int(one_cr.sum())
+    pipeline_one_cr = opps.loc[one_cr, "Amount"].sum()
 
-    open_opps = opps.loc[open_mask].copy()
-    won_opps = opps.loc[won_mask].copy()
-    lost_opps = opps.loc[lost_mask].copy()
+    # Day spans are computed once on the full frame; the outcome averages and the velocity chart reuse them.
+    # NaT on either side comes out as NaN, so no per-row missing-date guard is needed.
+    today = pd.Timestamp.today().normalize()
+    opps["days_to_close"] = (opps["Close Date"] - opps["Created Date"]).dt.days
+    opps["age_days"] = (today - opps["Created Date"]).dt.days
 
-    won_count = won_opps["Opportunity ID"].nunique()
-    lost_count = lost_opps["Opportunity ID"].nunique()
+    won_count = int(won_mask.sum())
+    lost_count = int(lost_mask.sum())
+    open_count = int(open_mask.sum())
     win_rate = won_count / (won_count + lost_count) if (won_count + lost_count) > 0 else 0
 
-    avg_cr_lost = lost_opps["contact_count"].mean() if not lost_opps.empty else 0
-    avg_cr_won = won_opps["contact_count"].mean() if not won_opps.empty else 0
-    avg_cr_open = open_opps["contact_count"].mean() if not open_opps.empty else 0
+    # Per-outcome averages index single columns by mask; no won/lost row slices of the full frame are built
+    contact_count = opps["contact_count"]
+    days_to_close = opps["days_to_close"]
+    avg_cr_lost = contact_count[lost_mask].mean() if lost_count > 0 else 0
+    avg_cr_won = contact_count[won_mask].mean() if won_count > 0 else 0
+    avg_cr_open = contact_count[open_mask].mean() if open_count > 0 else 0
 
-    won_zero_df = won_opps[won_opps["contact_count"] == 0].copy()
-    won_zero_count = won_zero_df["Opportunity ID"].nunique()
+    won_zero_df = opps.loc[won_mask & (contact_count == 0)]
+    won_zero_count = len(won_zero_df)
     won_zero_pipeline = won_zero_df["Amount"].sum()
     won_zero_pct = (won_zero_count / won_count) if won_count > 0 else 0
 
-    def days_diff(row):
-        if pd.isna(row["Created Date"]) or pd.isna(row["Close Date"]):
-            return None
-        return (row["Close Date"] - row["Created Date"]).days
-
-    if not lost_opps.empty:
-        lost_opps["days_to_close"] = lost_opps.apply(days_diff, axis=1)
-    if not won_opps.empty:
-        won_opps["days_to_close"] = won_opps.apply(days_diff, axis=1)
-
-    avg_days_lost = lost_opps["days_to_close"].dropna().mean() if "days_to_close" in lost_opps else None
-    avg_days_won = won_opps["days_to_close"].dropna().mean() if "days_to_close" in won_opps else None
-
-    today = pd.Timestamp.today().normalize()
-    if not open_opps.empty:
-        open_opps["age_days"] = (today - open_opps["Created Date"]).dt.days
-    avg_age_open = open_opps["age_days"].dropna().mean() if "age_days" in open_opps else None
+    avg_days_lost = days_to_close[lost_mask].mean() if lost_count > 0 else None
+    avg_days_won = days_to_close[won_mask].mean() if won_count > 0 else None
+    avg_age_open = opps["age_days"][open_mask].mean() if open_count > 0 else None
 
     # ======================================================
     # Buying Group Coverage Score
     # ======================================================
-    open_df = open_opps.copy()
-    open_opps_total = open_df["Opportunity ID"].nunique() if not open_df.empty else 0
-    pct_2plus_open = open_df[open_df["contact_count"] >= 2]["Opportunity ID"].nunique() / open_opps_total if open_opps_total > 0 else 0
-    pct_zero_open = open_df[open_df["contact_count"] == 0]["Opportunity ID"].nunique() / open_opps_total if open_opps_total > 0 else 0
+    open_df = opps.loc[open_mask].copy()
+    # Under-covered (0–1 roles) mask, reused by the risk KPIs, the priority list and the simulator
+    open_under = open_df["contact_count"] <= 1
+    # One histogram pass over open contact counts: [0 roles, 1 role, 2+ roles]
+    open_cc_hist = np.bincount(np.minimum(open_df["contact_count"].to_numpy(), 2), minlength=3)
+    open_opps_total = len(open_df)
+    pct_2plus_open = int(open_cc_hist[2]) / open_opps_total if open_opps_total > 0 else 0
+    pct_zero_open = int(open_cc_hist[0]) / open_opps_total if open_opps_total > 0 else 0
     gap_open_vs_won = max(0, avg_cr_won - avg_cr_open) if avg_cr_won and avg_cr_open is not None else 0
 
     score = (
@@ -700,8 +962,8 @@ if opps_file and roles_file:
     )
 
     open_pipeline = open_df["Amount"].sum() if not open_df.empty else 0
-    open_pipeline_risk = open_df[open_df["contact_count"] <= 1]["Amount"].sum() if not open_df.empty else 0
-    open_opps_risk = open_df[open_df["contact_count"] <= 1]["Opportunity ID"].nunique() if not open_df.empty else 0
+    open_pipeline_risk = open_df.loc[open_under, "Amount"].sum() if not open_df.empty else 0
+    open_opps_risk = int(open_cc_hist[0] + open_cc_hist[1])
     risk_pct = open_opps_risk / open_opps_total if open_opps_total > 0 else 0
     if open_pipeline_risk > 0:
         bullets.append(
@@ -732,7 +994,9 @@ if opps_file and roles_file:
     with g3:
         late_gate = st.number_input("Late stage gate (min contacts)", min_value=0, max_value=10, value=3, step=1)
 
-    gates_df = opps[opps["Stage Bucket"].isin(["Early", "Mid", "Late", "Won", "Lost"])].copy()
+    gates_df = opps.loc[
+        opps["Stage Bucket"].isin(["Early", "Mid", "Late", "Won", "Lost"]), ["Stage Bucket", "contact_count", "Amount"]
+    ]
     gate_map = {
         "Early": early_gate,
         "Mid": mid_gate,
@@ -741,29 +1005,22 @@ if opps_file and roles_file:
         "Lost": mid_gate
     }
 
-    def meets_gate(row):
-        b = row["Stage Bucket"]
-        c = row["contact_count"]
-        gate_val = gate_map.get(b, 0)
-        return c >= gate_val
-
     gate_roll = None
     if not gates_df.empty:
-        gates_df["Meets Gate"] = gates_df.apply(meets_gate, axis=1)
+        gates_df["Meets Gate"] = gates_df["contact_count"] >= gates_df["Stage Bucket"].map(gate_map).fillna(0)
+        gates_df["Amount Meeting Gate"] = gates_df["Amount"].where(gates_df["Meets Gate"], 0)
 
         gate_roll = gates_df.groupby("Stage Bucket").agg(
-            Opps=("Opportunity ID", "nunique"),
+            Opps=("Amount", "size"),
             Opps_Meeting_Gate=("Meets Gate", "sum"),
             Pipeline=("Amount", "sum"),
-            Pipeline_Meeting_Gate=("Amount", lambda s: s[gates_df.loc[s.index, "Meets Gate"]].sum())
+            Pipeline_Meeting_Gate=("Amount Meeting Gate", "sum")
         ).reindex(["Early", "Mid", "Late", "Won", "Lost"]).fillna(0).reset_index()
 
-        gate_roll["Opp Coverage %"] = gate_roll.apply(
-            lambda r: r["Opps_Meeting_Gate"] / r["Opps"] if r["Opps"] > 0 else 0, axis=1
-        )
-        gate_roll["Pipeline Coverage %"] = gate_roll.apply(
-            lambda r: r["Pipeline_Meeting_Gate"] / r["Pipeline"] if r["Pipeline"] > 0 else 0, axis=1
-        )
+        gate_roll["Opp Coverage %"] = (gate_roll["Opps_Meeting_Gate"] / gate_roll["Opps"]).where(gate_roll["Opps"] > 0, 0)
+        gate_roll["Pipeline Coverage %"] = (
+            gate_roll["Pipeline_Meeting_Gate"] / gate_roll["Pipeline"]
+        ).where(gate_roll["Pipeline"] > 0, 0)
         gate_roll["Gate Value"] = gate_roll["Stage Bucket"].map(gate_map).fillna(0).astype(int)
 
         display_gate = gate_roll.rename(columns={
@@ -774,7 +1031,7 @@ if opps_file and roles_file:
             "Pipeline_Meeting_Gate": "Pipeline meeting gate",
             "Opp Coverage %": "Opp Coverage %",
             "Pipeline Coverage %": "Pipeline Coverage %"
-        }).copy()
+        })
 
         display_gate["Pipeline"] = display_gate["Pipeline"].map(fmt_money)
         display_gate["Pipeline meeting gate"] = display_gate["Pipeline meeting gate"].map(fmt_money)
@@ -892,41 +1149,39 @@ if opps_file and roles_file:
     c_left, c_right = st.columns(2)
 
     with c_left:
-        label_with_tooltip("Total Opportunities", "Unique opportunities in the export.")
-        show_value(f"{total_opps:,}")
-        label_with_tooltip("Total Pipeline", "Sum of Amount for all opportunities.")
-        show_value(fmt_money(total_pipeline))
-        label_with_tooltip("Current Win Rate", "Won ÷ (Won + Lost).")
-        show_value(f"{win_rate:.1%}")
-        label_with_tooltip("Opportunities with Contact Roles", "Unique opportunities appearing in Contact Roles export.")
-        show_value(f"{opps_with_cr:,}")
-        label_with_tooltip("Opportunities without Contact Roles", "Total opps minus those with roles.")
-        show_value(f"{opps_without_cr:,}")
-        label_with_tooltip("Pipeline with Contact Roles", "Amount on opps with ≥1 role.")
-        show_value(fmt_money(pipeline_with_cr))
-        label_with_tooltip("Pipeline without Contact Roles", "Amount on opps with 0 roles.")
-        show_value(fmt_money(pipeline_without_cr))
-        label_with_tooltip("Opps with only 1 Contact Role", "Opps where role count = 1.")
-        show_value(f"{opps_one_cr:,}")
-        label_with_tooltip("Pipeline with only 1 Contact Role", "Amount on opps with exactly 1 role.")
-        show_value(fmt_money(pipeline_one_cr))
+        show_kpis([
+            ("Total Opportunities", "Unique opportunities in the export.", f"{total_opps:,}"),
+            ("Total Pipeline", "Sum of Amount for all opportunities.", fmt_money(total_pipeline)),
+            ("Current Win Rate", "Won ÷ (Won + Lost).", f"{win_rate:.1%}"),
+            ("Opportunities with Contact Roles", "Unique opportunities appearing in Contact Roles export.",
+             f"{opps_with_cr:,}"),
+            ("Opportunities without Contact Roles", "Total opps minus those with roles.", f"{opps_without_cr:,}"),
+            ("Pipeline with Contact Roles", "Amount on opps with ≥1 role.", fmt_money(pipeline_with_cr)),
+            ("Pipeline without Contact Roles", "Amount on opps with 0 roles.", fmt_money(pipeline_without_cr)),
+            ("Opps with only 1 Contact Role", "Opps where role count = 1.", f"{opps_one_cr:,}"),
+            ("Pipeline with only 1 Contact Role", "Amount on opps with exactly 1 role.", fmt_money(pipeline_one_cr)),
+        ])
 
     with c_right:
-        label_with_tooltip("Avg Contact Roles – Won", "Average roles per Won opportunity.")
-        show_value(f"{avg_cr_won:.1f}")
-        label_with_tooltip("Avg Contact Roles – Lost", "Average roles per Lost opportunity.")
-        show_value(f"{avg_cr_lost:.1f}")
-        label_with_tooltip("Avg Contact Roles – Open", "Average roles per Open opportunity.")
-        show_value(f"{avg_cr_open:.1f}")
+        right_kpis = [
+            ("Avg Contact Roles – Won", "Average roles per Won opportunity.", f"{avg_cr_won:.1f}"),
+            ("Avg Contact Roles – Lost", "Average roles per Lost opportunity.", f"{avg_cr_lost:.1f}"),
+            ("Avg Contact Roles – Open", "Average roles per Open opportunity.", f"{avg_cr_open:.1f}"),
+        ]
         if won_zero_count > 0:
-            label_with_tooltip("Won Opps with 0 Contact Roles", "Won opportunities missing buying-group contacts.")
-            show_value(f"{won_zero_count:,} ({won_zero_pct:.1%} of Won) — {fmt_money(won_zero_pipeline)}")
-        label_with_tooltip("Avg days to close – Won", "Close Date − Created Date for Won opps.")
-        show_value(f"{avg_days_won:.0f} days" if avg_days_won else "0 days")
-        label_with_tooltip("Avg days to close – Lost", "Close Date − Created Date for Lost opps.")
-        show_value(f"{avg_days_lost:.0f} days" if avg_days_lost else "0 days")
-        label_with_tooltip("Avg age of Open opps", "Today − Created Date for Open opps.")
-        show_value(f"{avg_age_open:.0f} days" if avg_age_open else "0 days")
+            right_kpis.append((
+                "Won Opps with 0 Contact Roles", "Won opportunities missing buying-group contacts.",
+                f"{won_zero_count:,} ({won_zero_pct:.1%} of Won) — {fmt_money(won_zero_pipeline)}"
+            ))
+        right_kpis += [
+            ("Avg days to close – Won", "Close Date − Created Date for Won opps.",
+             f"{avg_days_won:.0f} days" if avg_days_won else "0 days"),
+            ("Avg days to close – Lost", "Close Date − Created Date for Lost opps.",
+             f"{avg_days_lost:.0f} days" if avg_days_lost else "0 days"),
+            ("Avg age of Open opps", "Today − Created Date for Open opps.",
+             f"{avg_age_open:.0f} days" if avg_age_open else "0 days"),
+        ]
+        show_kpis(right_kpis)
 
     section_end()
 
@@ -938,13 +1193,13 @@ if opps_file and roles_file:
         "Open deals with **0–1 contact roles** consistently behave more like Lost deals. "
         "This is your near-term exposure if coverage doesn’t improve."
     )
-    label_with_tooltip("Open Pipeline at Risk", "Sum of Amount for open opps with 0–1 contact roles.")
-    show_value(fmt_money(open_pipeline_risk))
-    label_with_tooltip("% of Open Opps Missing Contacts", "Open opps with 0–1 roles ÷ total open opps.")
-    show_value(f"{risk_pct:.1%} ({open_opps_risk:,} of {open_opps_total:,})")
     pct_open_pipe_risk = (open_pipeline_risk / open_pipeline) if open_pipeline > 0 else 0
-    label_with_tooltip("% of Open Pipeline at Risk", "Risky open pipeline ÷ total open pipeline.")
-    show_value(f"{pct_open_pipe_risk:.1%}")
+    show_kpis([
+        ("Open Pipeline at Risk", "Sum of Amount for open opps with 0–1 contact roles.", fmt_money(open_pipeline_risk)),
+        ("% of Open Opps Missing Contacts", "Open opps with 0–1 roles ÷ total open opps.",
+         f"{risk_pct:.1%} ({open_opps_risk:,} of {open_opps_total:,})"),
+        ("% of Open Pipeline at Risk", "Risky open pipeline ÷ total open pipeline.", f"{pct_open_pipe_risk:.1%}"),
+    ])
     section_end()
 
     # ======================================================
@@ -955,38 +1210,39 @@ if opps_file and roles_file:
         "Charts below mirror the story: coverage drives win rate and speed, and shows where risk sits today."
     )
 
-    chart_df = opps.copy()
-    chart_df["Stage Group"] = "Open"
-    chart_df.loc[won_mask, "Stage Group"] = "Won"
-    chart_df.loc[lost_mask, "Stage Group"] = "Lost"
-
-    def contact_bucket_winrate(n):
-        n = float(n) if pd.notna(n) else 0
-        if n <= 0:
-            return None
-        if n >= 7:
-            return "7+"
-        return str(int(n))
-
-    chart_df["Winrate Bucket"] = chart_df["contact_count"].apply(contact_bucket_winrate)
+    # Only the numeric columns the charts aggregate are copied, not the wide name/owner/ID columns
+    chart_df = opps[["Amount", "contact_count", "days_to_close", "age_days"]].copy()
+    # Stage Group as int8 codes (Lost wins over Won when a stage is mapped to both); every filter below
+    # compares the codes instead of walking label strings.
+    sg_codes = np.full(len(chart_df), SG_OPEN, dtype=np.int8)
+    sg_codes[won_mask.to_numpy()] = SG_WON
+    sg_codes[lost_mask.to_numpy()] = SG_LOST
+    chart_df["_sg"] = sg_codes
+
+    # Closed deals with 1..7+ contact roles fall into buckets 0..6; won and lost counts per bucket are
+    # each one bincount pass over the codes (0-contact deals, Won or Lost, stay out of the chart).
     win_bucket_order = ["1", "2", "3", "4", "5", "6", "7+"]
-
-    closed_df = chart_df[chart_df["Stage Group"].isin(["Won", "Lost"])].copy()
-    closed_df = closed_df[~((closed_df["Stage Group"] == "Won") & (closed_df["contact_count"] == 0))]
-    closed_df = closed_df[closed_df["Winrate Bucket"].notna()]
-
-    winrate_bucket = closed_df.groupby("Winrate Bucket").agg(
-        won=("Stage Group", lambda s: (s == "Won").sum()),
-        lost=("Stage Group", lambda s: (s == "Lost").sum())
-    ).reindex(win_bucket_order).fillna(0).reset_index()
-
-    winrate_bucket["n"] = winrate_bucket["won"] + winrate_bucket["lost"]
-    winrate_bucket["Win Rate"] = winrate_bucket.apply(
-        lambda rr: rr["won"] / rr["n"] if rr["n"] > 0 else 0, axis=1
+    chart_cc = chart_df["contact_count"].to_numpy()
+    win_bucket_codes = np.clip(chart_cc, 1, len(win_bucket_order)).astype(np.intp) - 1
+    has_contacts = chart_cc > 0
+    won_by_bucket = np.bincount(
+        win_bucket_codes[has_contacts & (sg_codes == SG_WON)], minlength=len(win_bucket_order)
+    )
+    lost_by_bucket = np.bincount(
+        win_bucket_codes[has_contacts & (sg_codes == SG_LOST)], minlength=len(win_bucket_order)
+    )
+    winrate_bucket = pd.DataFrame({
+        "Winrate Bucket": win_bucket_order,
+        "won": won_by_bucket,
+        "lost": lost_by_bucket
+    })
+
+    closed_by_bucket = won_by_bucket + lost_by_bucket
+    winrate_bucket["n"] = closed_by_bucket
+    winrate_bucket["Win Rate"] = np.divide(
+        won_by_bucket, closed_by_bucket, out=np.zeros(len(win_bucket_order)), where=closed_by_bucket > 0
     )
-    cis = winrate_bucket.apply(lambda rr: wilson_ci(rr["won"], rr["n"]), axis=1)
-    winrate_bucket["CI Low"] = [c[0] for c in cis]
-    winrate_bucket["CI High"] = [c[1] for c in cis]
+    winrate_bucket["CI Low"], winrate_bucket["CI High"] = wilson_ci_vec(won_by_bucket, closed_by_bucket)
 
     bars_n = alt.Chart(winrate_bucket).mark_bar(opacity=0.35).encode(
         x=alt.X("Winrate Bucket:N", sort=win_bucket_order, title="Contact Roles per Opportunity"),
@@ -1008,17 +1264,19 @@ if opps_file and roles_file:
         ]
     )
 
-    st.altair_chart(
+    winrate_chart = (
         alt.layer(bars_n, band_ci, line_wr)
         .resolve_scale(y='independent')
-        .properties(height=280, title="Win rate improves sharply after 2+ contact roles"),
-        use_container_width=True
+        .properties(height=280, title="Win rate improves sharply after 2+ contact roles")
     )
 
-    open_chart_df = chart_df[chart_df["Stage Group"] == "Open"].copy()
-    open_chart_df["Open Coverage Bucket"] = open_chart_df["contact_count"].apply(
-        lambda n: "0 roles" if n == 0 else ("1 role" if n == 1 else "2+ roles")
-    )
+    # Coverage bucket labels are gathered by clipped contact count (0, 1, 2+ / 0, 1, 2, 3+) in one array pass
+    coverage_labels = np.array(["0 roles", "1 role", "2+ roles"], dtype=object)
+    funnel_labels = np.array(["0 roles", "1 role", "2 roles", "3+ roles"], dtype=object)
+
+    open_chart_df = chart_df[chart_df["_sg"] == SG_OPEN].copy()
+    open_cc = open_chart_df["contact_count"].to_numpy()
+    open_chart_df["Open Coverage Bucket"] = coverage_labels[np.minimum(open_cc, 2)]
     open_pipeline_bucket = open_chart_df.groupby("Open Coverage Bucket")["Amount"].sum().reindex(
         ["0 roles", "1 role", "2+ roles"]
     ).fillna(0).reset_index().rename(columns={"Amount": "Open Pipeline"})
@@ -1028,51 +1286,39 @@ if opps_file and roles_file:
         color=alt.Color("Open Coverage Bucket:N", legend=None),
         tooltip=["Open Coverage Bucket", alt.Tooltip("Open Pipeline:Q", format=",.0f")]
     ).properties(height=260, title="Open pipeline concentration by coverage (risk today)")
-    st.altair_chart(donut, use_container_width=True)
-
-    funnel_df = open_chart_df.copy()
-    funnel_df["Coverage Funnel Bucket"] = funnel_df["contact_count"].apply(
-        lambda n: "0 roles" if n == 0 else ("1 role" if n == 1 else ("2 roles" if n == 2 else "3+ roles"))
-    )
-    funnel_counts = funnel_df.groupby("Coverage Funnel Bucket")["Opportunity ID"].nunique().reindex(
+    open_chart_df["Coverage Funnel Bucket"] = funnel_labels[np.minimum(open_cc, 3)]
+    funnel_counts = open_chart_df.groupby("Coverage Funnel Bucket").size().reindex(
         ["0 roles", "1 role", "2 roles", "3+ roles"]
-    ).fillna(0).reset_index().rename(columns={"Opportunity ID": "Open Opps"})
+    ).fillna(0).reset_index(name="Open Opps")
 
     funnel_chart = alt.Chart(funnel_counts).mark_bar().encode(
         y=alt.Y("Coverage Funnel Bucket:N", sort=["0 roles","1 role","2 roles","3+ roles"], title="Coverage bucket"),
         x=alt.X("Open Opps:Q", title="# Open Opportunities"),
         tooltip=["Coverage Funnel Bucket", "Open Opps"]
     ).properties(height=220, title="Coverage funnel for open deals (where depth is missing)")
-    st.altair_chart(funnel_chart, use_container_width=True)
-
-    time_df = chart_df.copy()
-    time_df["days_to_close"] = time_df.apply(days_diff, axis=1)
-    time_df["open_age_days"] = None
-    open_mask_local = (time_df["Stage Group"] == "Open") & time_df["Created Date"].notna()
-    time_df.loc[open_mask_local, "open_age_days"] = (today - time_df.loc[open_mask_local, "Created Date"]).dt.days
-
-    def contact_bucket_std(n):
-        n = float(n) if pd.notna(n) else 0
-        if n <= 0: return "0"
-        if n == 1: return "1"
-        if n == 2: return "2"
-        if n == 3: return "3"
-        return "4+"
-
-    time_df["Contact Bucket"] = time_df["contact_count"].apply(contact_bucket_std)
+    # Narrow working frames to the columns their groupbys read, so copies and reductions don't drag
+    # the wide object columns (names, owners, IDs) through memory.
+    time_df = chart_df[["_sg", "contact_count", "days_to_close"]].copy()
+    # float64 straight away (NaN for non-open deals or missing Created Date), never an object column
+    time_df["open_age_days"] = chart_df["age_days"].where(time_df["_sg"] == SG_OPEN)
+
+    # contact_count is a non-negative int, so buckets 0, 1, 2, 3, 4+ are a gather by the count clipped at 4
     bucket_order_std = ["0", "1", "2", "3", "4+"]
+    time_df["Contact Bucket"] = np.array(bucket_order_std, dtype=object)[
+        np.minimum(time_df["contact_count"].to_numpy(), 4)
+    ]
 
     agg_rows = []
-    for sg in ["Won", "Lost"]:
-        tmp = time_df[time_df["Stage Group"] == sg]
+    for sg_code in (SG_WON, SG_LOST):
+        tmp = time_df[time_df["_sg"] == sg_code]
         grp = tmp.groupby("Contact Bucket")["days_to_close"].mean().reindex(bucket_order_std).reset_index()
-        grp["Stage Group"] = sg
+        grp["Stage Group"] = STAGE_GROUPS[sg_code]
         grp = grp.rename(columns={"days_to_close": "Avg Days"})
         agg_rows.append(grp)
 
-    tmp_open = time_df[time_df["Stage Group"] == "Open"]
+    tmp_open = time_df[time_df["_sg"] == SG_OPEN]
     grp_open = tmp_open.groupby("Contact Bucket")["open_age_days"].mean().reindex(bucket_order_std).reset_index()
-    grp_open["Stage Group"] = "Open"
+    grp_open["Stage Group"] = STAGE_GROUPS[SG_OPEN]
     grp_open = grp_open.rename(columns={"open_age_days": "Avg Days"})
     agg_rows.append(grp_open)
 
@@ -1084,20 +1330,15 @@ if opps_file and roles_file:
         color=alt.Color("Stage Group:N", legend=alt.Legend(title="Outcome")),
         tooltip=["Stage Group", "Contact Bucket", alt.Tooltip("Avg Days:Q", format=",.0f")]
     ).properties(height=260, title="More contact roles correlates with faster closes")
-    st.altair_chart(vel_chart, use_container_width=True)
-
-    stage_cov_df = opps.copy()
-    stage_cov_df["Coverage Bucket"] = stage_cov_df["contact_count"].apply(
-        lambda n: "0 roles" if n == 0 else ("1 role" if n == 1 else "2+ roles")
-    )
+    stage_cov_df = opps[["Opportunity ID", "Stage Bucket", "contact_count"]].copy()
+    stage_cov_df["Coverage Bucket"] = coverage_labels[np.minimum(stage_cov_df["contact_count"].to_numpy(), 2)]
 
-    heat_base = stage_cov_df[stage_cov_df["Stage Bucket"].isin(["Early","Mid","Late","Open"])].copy()
-    heat_counts = heat_base.groupby(["Stage Bucket","Coverage Bucket"])["Opportunity ID"].nunique().reset_index()
-    stage_totals = heat_base.groupby("Stage Bucket")["Opportunity ID"].nunique().reset_index().rename(columns={"Opportunity ID":"Stage Total"})
-    heat_counts = heat_counts.merge(stage_totals, on="Stage Bucket", how="left")
-    heat_counts["Pct"] = heat_counts.apply(
-        lambda rr: rr["Opportunity ID"]/rr["Stage Total"] if rr["Stage Total"]>0 else 0, axis=1
-    )
+    heat_base = stage_cov_df[stage_cov_df["Stage Bucket"].isin(["Early","Mid","Late","Open"])]
+    heat_ct = pd.crosstab(heat_base["Stage Bucket"], heat_base["Coverage Bucket"])
+    heat_counts = heat_ct.stack().rename("Opportunity ID").reset_index()
+    heat_counts = heat_counts[heat_counts["Opportunity ID"] > 0].reset_index(drop=True)
+    heat_counts["Stage Total"] = heat_counts["Stage Bucket"].map(heat_ct.sum(axis=1))
+    heat_counts["Pct"] = heat_counts["Opportunity ID"] / heat_counts["Stage Total"]
 
     heat = alt.Chart(heat_counts).mark_rect().encode(
         x=alt.X("Coverage Bucket:N", sort=["0 roles","1 role","2+ roles"], title="Coverage"),
@@ -1109,7 +1350,12 @@ if opps_file and roles_file:
             alt.Tooltip("Opportunity ID:Q", title="# Opps")
         ]
     ).properties(height=240, title="Coverage health by stage bucket (where gaps show up)")
-    st.altair_chart(heat, use_container_width=True)
+
+    # One vconcat spec: a single payload to the browser and one Vega-Lite compile for all five charts
+    st.altair_chart(
+        alt.vconcat(winrate_chart, donut, funnel_chart, vel_chart, heat).resolve_scale(color="independent"),
+        use_container_width=True
+    )
 
     section_end()
 
@@ -1135,128 +1381,161 @@ if opps_file and roles_file:
     open_df["stage_weight"] = open_df["Stage Bucket"].map(stage_weights).fillna(0.5)
     open_df["weighted_amount"] = open_df["Amount"] * open_df["stage_weight"]
 
-    open_df["model_bucket"] = open_df["contact_count"].apply(as_bucket_for_model)
-    open_df["bucket_wr"] = open_df["model_bucket"].map(wr_map).fillna(win_rate)
-    open_df["bucket_ci_low"] = open_df["model_bucket"].map(ci_low_map).fillna(win_rate)
-    open_df["bucket_ci_high"] = open_df["model_bucket"].map(ci_high_map).fillna(win_rate)
-
-    current_expected_weighted = (open_df["weighted_amount"] * open_df["bucket_wr"]).sum()
-    current_expected_low = (open_df["weighted_amount"] * open_df["bucket_ci_low"]).sum()
-    current_expected_high = (open_df["weighted_amount"] * open_df["bucket_ci_high"]).sum()
-
-    simulator_title = "Live Simulator — How coverage changes can improve your pipeline"
-    section_start(simulator_title)
-    st.caption(
-        "This simulator uses **your historical closed-deal data** to estimate how buying-group depth changes outcomes. "
-        "Late/Mid stages are weighted more heavily because coverage matters most closer to close."
-    )
-
-    st.markdown("**A) Improve average coverage on all open deals**")
-    target_contacts = st.slider("Target avg contacts on Open Opportunities", 0.0, 7.0, 3.0, 0.5)
-    target_bucket = as_bucket_for_model(target_contacts)
-
-    target_wr = wr_map.get(target_bucket, win_rate)
-    target_ci_low = ci_low_map.get(target_bucket, target_wr)
-    target_ci_high = ci_high_map.get(target_bucket, target_wr)
-
-    enhanced_expected_weighted = (open_df["weighted_amount"] * target_wr).sum()
-    enhanced_expected_low = (open_df["weighted_amount"] * target_ci_low).sum()
-    enhanced_expected_high = (open_df["weighted_amount"] * target_ci_high).sum()
-
-    inc_weighted = max(0, enhanced_expected_weighted - current_expected_weighted)
-    inc_low = max(0, enhanced_expected_low - current_expected_high)
-    inc_high = max(0, enhanced_expected_high - current_expected_low)
-
-    delta_vs_current = target_contacts - avg_cr_open
-    if abs(delta_vs_current) < 0.01:
-        status_text = "Status-quo outlook (you’re modeling today’s average coverage — no change)"
-    elif delta_vs_current > 0:
-        status_text = (
-            f"Status-quo outlook (current state before improving coverage by "
-            f"{delta_vs_current:+.1f} contacts on average)"
-        )
-    else:
-        status_text = (
-            f"Status-quo outlook (if average coverage drops by "
-            f"{delta_vs_current:.1f} contacts, this is the baseline you’re moving away from)"
-        )
+    # Integer contact counts bucket exactly like as_bucket_for_model (0 → "1", 7+ → "7+"), i.e. by position
+    # in win_bucket_order, so each open deal's (win rate, CI low, CI high) is one row gather
+    open_bucket_codes = np.clip(open_df["contact_count"].to_numpy(), 1, len(win_bucket_order)) - 1
+    open_rates = winrate_bucket[["Win Rate", "CI Low", "CI High"]].to_numpy(dtype=np.float64)[open_bucket_codes]
+    open_rates = np.where(np.isnan(open_rates), win_rate, open_rates)
 
-    st.markdown(f"**{status_text}**")
-    label_with_tooltip("Stage-weighted Expected Won Pipeline (Open) — Current",
-                       "Sum of (open Amount × stage weight × win rate for its current contact bucket).")
-    show_value(fmt_money(current_expected_weighted))
-
-    st.markdown("**Modeled uplift if average coverage improves to target**")
-    pct_contacts = (delta_vs_current / avg_cr_open) if avg_cr_open > 0 else 0
-    label_with_tooltip("Target Avg Contacts (Open)",
-                       "Selected target vs current average contacts on open deals.")
-    show_value(f"{target_contacts:.1f} vs Current {avg_cr_open:.1f} ({delta_vs_current:+.1f}, {pct_contacts:+.0%})")
-
-    label_with_tooltip("Modeled Win Rate at Target (from your closed deals)",
-                       "Win rate observed historically for the selected contact bucket.")
-    show_value(f"{target_wr:.1%} (95% CI {target_ci_low:.1%}–{target_ci_high:.1%})")
-
-    pct_pipe = (inc_weighted / current_expected_weighted) if current_expected_weighted > 0 else 0
-    label_with_tooltip("Incremental Stage-weighted Won Pipeline (modeled)",
-                       "Difference between target and current expected won pipeline.")
-    show_value(
-        f"{fmt_money(inc_weighted)} uplift "
-        f"(range {fmt_money(inc_low)}–{fmt_money(inc_high)}, {pct_pipe:+.0%})"
+    # One fused pass: weighted amounts x (win rate, CI low, CI high) columns
+    open_weighted = open_df["weighted_amount"].to_numpy(dtype=np.float64)
+    current_expected_weighted, current_expected_low, current_expected_high = (
+        float(v) for v in open_weighted @ open_rates
     )
 
-    st.markdown("---")
-    st.markdown("**B) Fix the top under-covered open deals first (tactical plan)**")
-
+    simulator_title = "Live Simulator — How coverage changes can improve your pipeline"
     stage_priority_order = {"Late": 0, "Mid": 1, "Early": 2, "Open": 3}
     open_df["Stage Bucket Rank"] = open_df["Stage Bucket"].map(stage_priority_order).fillna(3)
 
-    priority_df = open_df[open_df["contact_count"] <= 1].copy()
-    priority_df = priority_df[~priority_df["Stage"].str.contains("Qualified Out", case=False, na=False)].copy()
-    priority_df = priority_df.sort_values(["Stage Bucket Rank", "Amount"], ascending=[True, False])
-
-    max_fix = min(25, len(priority_df))
-    fix_n = st.slider("How many top under-covered deals do we fix?", 0, max_fix, min(10, max_fix), 1)
-
-    to_fix = priority_df.head(fix_n).copy()
-    remaining = open_df.drop(index=to_fix.index).copy()
-
-    fix_expected_weighted = (to_fix["weighted_amount"] * target_wr).sum()
-    fix_expected_low = (to_fix["weighted_amount"] * target_ci_low).sum()
-    fix_expected_high = (to_fix["weighted_amount"] * target_ci_high).sum()
-
-    rem_expected_weighted = (remaining["weighted_amount"] * remaining["bucket_wr"]).sum()
-    rem_expected_low = (remaining["weighted_amount"] * remaining["bucket_ci_low"]).sum()
-    rem_expected_high = (remaining["weighted_amount"] * remaining["bucket_ci_high"]).sum()
-
-    tactical_expected = fix_expected_weighted + rem_expected_weighted
-    tactical_low = fix_expected_low + rem_expected_high
-    tactical_high = fix_expected_high + rem_expected_low
+    priority_df = open_df[open_under]
+    priority_df = priority_df[~priority_df["Stage"].str.contains("Qualified Out", case=False, na=False)]
+    # Only the top 25 rows are ever used: order the two key arrays (Late → Early, then largest Amount)
+    # and take those positions instead of reordering the whole frame.
+    priority_order = np.lexsort((
+        -priority_df["Amount"].to_numpy(dtype=np.float64),
+        priority_df["Stage Bucket Rank"].to_numpy()
+    ))
+    priority_df = priority_df.iloc[priority_order[:25]]
+    # Row positions of the priority list within open_df, so the tactical plan can split the weighted
+    # amounts with array indexing on every slider move
+    priority_pos = open_df.index.get_indexer(priority_df.index)
+    open_weighted_total = float(open_weighted.sum())
+
+    # The simulator sliders only move the numbers in this section, so it reruns as a fragment instead of
+    # re-executing the whole report. Its PDF rows are updated in place for the (lazily built) download.
+    simulator_pdf_rows = []
+
+    @st.fragment
+    def live_simulator():
+        section_start(simulator_title)
+        st.caption(
+            "This simulator uses **your historical closed-deal data** to estimate how buying-group depth changes outcomes. "
+            "Late/Mid stages are weighted more heavily because coverage matters most closer to close."
+        )
 
-    tactical_inc = max(0, tactical_expected - current_expected_weighted)
-    tactical_inc_low = max(0, tactical_low - current_expected_high)
-    tactical_inc_high = max(0, tactical_high - current_expected_low)
+        st.markdown("**A) Improve average coverage on all open deals**")
+        target_contacts = st.slider("Target avg contacts on Open Opportunities", 0.0, 7.0, 3.0, 0.5)
+        target_bucket = as_bucket_for_model(target_contacts)
+
+        target_wr = wr_map.get(target_bucket, win_rate)
+        target_ci_low = ci_low_map.get(target_bucket, target_wr)
+        target_ci_high = ci_high_map.get(target_bucket, target_wr)
+
+        # A single target rate applies to every deal, so each expectation is a scalar times the weighted total
+        enhanced_expected_weighted = open_weighted_total * target_wr
+        enhanced_expected_low = open_weighted_total * target_ci_low
+        enhanced_expected_high = open_weighted_total * target_ci_high
+
+        inc_weighted = max(0, enhanced_expected_weighted - current_expected_weighted)
+        inc_low = max(0, enhanced_expected_low - current_expected_high)
+        inc_high = max(0, enhanced_expected_high - current_expected_low)
+
+        delta_vs_current = target_contacts - avg_cr_open
+        if abs(delta_vs_current) < 0.01:
+            status_text = "Status-quo outlook (you’re modeling today’s average coverage — no change)"
+        elif delta_vs_current > 0:
+            status_text = (
+                f"Status-quo outlook (current state before improving coverage by "
+                f"{delta_vs_current:+.1f} contacts on average)"
+            )
+        else:
+            status_text = (
+                f"Status-quo outlook (if average coverage drops by "
+                f"{delta_vs_current:.1f} contacts, this is the baseline you’re moving away from)"
+            )
 
-    label_with_tooltip("Incremental Won Pipeline if we fix top deals",
-                       "Target bucket win rate applied only to top under-covered deals.")
-    show_value(f"{fmt_money(tactical_inc)} uplift (range {fmt_money(tactical_inc_low)}–{fmt_money(tactical_inc_high)})")
+        st.markdown(f"**{status_text}**")
+        show_kpis([(
+            "Stage-weighted Expected Won Pipeline (Open) — Current",
+            "Sum of (open Amount × stage weight × win rate for its current contact bucket).",
+            fmt_money(current_expected_weighted)
+        )])
+
+        st.markdown("**Modeled uplift if average coverage improves to target**")
+        pct_contacts = (delta_vs_current / avg_cr_open) if avg_cr_open > 0 else 0
+        pct_pipe = (inc_weighted / current_expected_weighted) if current_expected_weighted > 0 else 0
+        show_kpis([
+            ("Target Avg Contacts (Open)",
+             "Selected target vs current average contacts on open deals.",
+             f"{target_contacts:.1f} vs Current {avg_cr_open:.1f} ({delta_vs_current:+.1f}, {pct_contacts:+.0%})"),
+            ("Modeled Win Rate at Target (from your closed deals)",
+             "Win rate observed historically for the selected contact bucket.",
+             f"{target_wr:.1%} (95% CI {target_ci_low:.1%}–{target_ci_high:.1%})"),
+            ("Incremental Stage-weighted Won Pipeline (modeled)",
+             "Difference between target and current expected won pipeline.",
+             f"{fmt_money(inc_weighted)} uplift "
+             f"(range {fmt_money(inc_low)}–{fmt_money(inc_high)}, {pct_pipe:+.0%})"),
+        ])
+
+        st.markdown("---")
+        st.markdown("**B) Fix the top under-covered open deals first (tactical plan)**")
+
+        max_fix = min(25, len(priority_df))
+        fix_n = st.slider("How many top under-covered deals do we fix?", 0, max_fix, min(10, max_fix), 1)
+
+        remaining = np.ones(len(open_weighted), dtype=bool)
+        remaining[priority_pos[:fix_n]] = False
+
+        fix_weighted_total = float(open_weighted[priority_pos[:fix_n]].sum())
+        fix_expected_weighted = fix_weighted_total * target_wr
+        fix_expected_low = fix_weighted_total * target_ci_low
+        fix_expected_high = fix_weighted_total * target_ci_high
+
+        rem_expected_weighted, rem_expected_low, rem_expected_high = (
+            float(v) for v in open_weighted[remaining] @ open_rates[remaining]
+        )
 
-    st.markdown("---")
-    st.markdown("**What needs to happen to hit the target?**")
-    required_new_contacts_total = max(0, (target_contacts - avg_cr_open)) * open_opps_total
-    required_new_contacts_total = int(round(required_new_contacts_total))
+        tactical_expected = fix_expected_weighted + rem_expected_weighted
+        tactical_low = fix_expected_low + rem_expected_high
+        tactical_high = fix_expected_high + rem_expected_low
+
+        tactical_inc = max(0, tactical_expected - current_expected_weighted)
+        tactical_inc_low = max(0, tactical_low - current_expected_high)
+        tactical_inc_high = max(0, tactical_high - current_expected_low)
+
+        show_kpis([(
+            "Incremental Won Pipeline if we fix top deals",
+            "Target bucket win rate applied only to top under-covered deals.",
+            f"{fmt_money(tactical_inc)} uplift (range {fmt_money(tactical_inc_low)}–{fmt_money(tactical_inc_high)})"
+        )])
+
+        st.markdown("---")
+        st.markdown("**What needs to happen to hit the target?**")
+        required_new_contacts_total = max(0, (target_contacts - avg_cr_open)) * open_opps_total
+        required_new_contacts_total = int(round(required_new_contacts_total))
+
+        late_under = int((open_under & (open_df["Stage Bucket"] == "Late")).sum())
+        mid_under = int((open_under & (open_df["Stage Bucket"] == "Mid")).sum())
+
+        st.markdown(
+            f"""
+    • To reach **{target_contacts:.1f} avg contacts**, you need roughly **{required_new_contacts_total:,} new stakeholders** added across open deals.  
+    • Start with **Late/Mid stage** gaps (**Late under-covered: {late_under:,}**, **Mid under-covered: {mid_under:,}**).  
+    • Use the “Top Open Opportunities to Fix First” list to execute weekly, then re-run the simulator to track uplift.
+            """
+        )
 
-    late_under = open_df[(open_df["Stage Bucket"] == "Late") & (open_df["contact_count"] <= 1)]["Opportunity ID"].nunique()
-    mid_under = open_df[(open_df["Stage Bucket"] == "Mid") & (open_df["contact_count"] <= 1)]["Opportunity ID"].nunique()
+        simulator_pdf_rows[:] = [
+            ["Target Avg Contacts (Open)", f"{target_contacts:.1f} (bucket {target_bucket})"],
+            ["Modeled Win Rate at Target", f"{target_wr:.1%} (CI {target_ci_low:.1%}–{target_ci_high:.1%})"],
+            ["Current Stage-weighted Expected Won Pipeline", fmt_money(current_expected_weighted)],
+            ["Incremental Stage-weighted Won Pipeline", f"{fmt_money(inc_weighted)} (range {fmt_money(inc_low)}–{fmt_money(inc_high)})"],
+            ["Incremental if Fix Top N Deals", f"N={fix_n}: {fmt_money(tactical_inc)} (range {fmt_money(tactical_inc_low)}–{fmt_money(tactical_inc_high)})"],
+        ]
 
-    st.markdown(
-        f"""
-• To reach **{target_contacts:.1f} avg contacts**, you need roughly **{required_new_contacts_total:,} new stakeholders** added across open deals.  
-• Start with **Late/Mid stage** gaps (**Late under-covered: {late_under:,}**, **Mid under-covered: {mid_under:,}**).  
-• Use the “Top Open Opportunities to Fix First” list to execute weekly, then re-run the simulator to track uplift.
-        """
-    )
+        section_end()
 
-    section_end()
+    live_simulator()
 
     # ======================================================
     # Owner Coverage Rollup (Coaching View)
@@ -1267,24 +1546,22 @@ if opps_file and roles_file:
         "Expand any rep to see exactly which deals to fix."
     )
 
-    owner_df = open_df.copy()
-    owner_df["Opportunity Owner"] = owner_df["Opportunity Owner"].fillna("").astype(str).str.strip()
-    owner_df = owner_df[owner_df["Opportunity Owner"] != ""].copy()
+    # Owner names are stripped and categorical from load time
+    owner_df = open_df[open_df["Opportunity Owner"] != ""].copy()
 
     owner_df["is_undercovered"] = (owner_df["contact_count"] <= 1).astype(int)
     owner_df["undercovered_amount"] = owner_df["Amount"].where(owner_df["contact_count"] <= 1, 0)
 
-    owner_roll = owner_df.groupby("Opportunity Owner", dropna=False).agg(
-        open_opps=("Opportunity ID", "nunique"),
+    owner_roll = owner_df.groupby("Opportunity Owner", dropna=False, observed=True).agg(
+        open_opps=("Opportunity ID", "size"),
         opps_undercovered=("is_undercovered", "sum"),
         open_pipeline=("Amount", "sum"),
         undercovered_pipeline=("undercovered_amount", "sum")
     ).reset_index()
 
-    owner_roll["pct_undercovered"] = owner_roll.apply(
-        lambda r: r["opps_undercovered"] / r["open_opps"] if r["open_opps"] > 0 else 0,
-        axis=1
-    )
+    owner_roll["pct_undercovered"] = (
+        owner_roll["opps_undercovered"] / owner_roll["open_opps"]
+    ).where(owner_roll["open_opps"] > 0, 0)
     owner_roll = owner_roll.sort_values("pct_undercovered", ascending=False)
 
     owner_bullets_pdf = []
@@ -1292,17 +1569,18 @@ if opps_file and roles_file:
     if owner_roll.empty:
         st.markdown("No open opportunities found for the selected filters.")
     else:
-        for _, r in owner_roll.iterrows():
-            open_opps_n = int(r["open_opps"])
+        # Plain column iteration: no per-row Series like iterrows
+        for owner_name, open_opps_n, under_n, pct_under, open_pipe, under_pipe in zip(
+            owner_roll["Opportunity Owner"],
+            owner_roll["open_opps"].astype(int),
+            owner_roll["opps_undercovered"].astype(int),
+            owner_roll["pct_undercovered"].astype(float),
+            owner_roll["open_pipeline"].astype(float),
+            owner_roll["undercovered_pipeline"].astype(float),
+        ):
             if open_opps_n == 0:
                 continue
 
-            owner_name = r["Opportunity Owner"]
-            under_n = int(r["opps_undercovered"])
-            pct_under = float(r["pct_undercovered"])
-            open_pipe = float(r["open_pipeline"])
-            under_pipe = float(r["undercovered_pipeline"])
-
             exp_title = f"{owner_name} — {pct_under:.0%} open opps under-covered ({under_n}/{open_opps_n})"
             owner_bullets_pdf.append(
                 f"{owner_name}: {pct_under:.0%} under-covered open opps ({under_n}/{open_opps_n}); "
@@ -1317,7 +1595,7 @@ if opps_file and roles_file:
                 rep_under = owner_df[
                     (owner_df["Opportunity Owner"] == owner_name) &
                     (owner_df["contact_count"] <= 1)
-                ].copy()
+                ]
 
                 if rep_under.empty:
                     st.write("✅ No under-covered open opportunities for this rep.")
@@ -1361,23 +1639,16 @@ if opps_file and roles_file:
         "so the most urgent deals appear on top."
     )
 
-    priority_df2 = open_df[open_df["contact_count"] <= 1].copy()
-    priority_df2 = priority_df2[~priority_df2["Stage"].str.contains("Qualified Out", case=False, na=False)].copy()
-    priority_df2["Stage Bucket Rank"] = priority_df2["Stage Bucket"].map(stage_priority_order).fillna(3)
-    priority_df2 = priority_df2.sort_values(
-        ["Stage Bucket Rank", "Amount"],
-        ascending=[True, False]
-    ).head(15)
-
-    priority_bullets = []
-    for _, rr in priority_df2.iterrows():
-        priority_bullets.append(
-            f"[{rr.get('Stage Bucket','Open')}] {rr.get('Opportunity Name','(No name)')} "
-            f"(ID {rr.get('Opportunity ID','')}) — Stage: {rr.get('Stage','')}, "
-            f"Owner: {rr.get('Opportunity Owner','')}, "
-            f"Contacts: {int(rr.get('contact_count',0))}, "
-            f"Amount: ${rr.get('Amount',0):,.0f}"
-        )
+    # Same filter and ordering as the simulator's priority list, already ranked above
+    priority_df2 = priority_df.head(15)
+
+    priority_bullets = (
+        "[" + priority_df2["Stage Bucket"] + "] " + priority_df2["Opportunity Name"].astype(str)
+        + " (ID " + priority_df2["Opportunity ID"] + ") — Stage: " + priority_df2["Stage"].astype(str)
+        + ", Owner: " + priority_df2["Opportunity Owner"].astype(str)
+        + ", Contacts: " + priority_df2["contact_count"].astype(int).astype(str)
+        + ", Amount: " + priority_df2["Amount"].map("${:,.0f}".format)
+    ).tolist()
 
     if priority_bullets:
         for b in priority_bullets:
@@ -1398,12 +1669,12 @@ if opps_file and roles_file:
             "Fixing this improves reporting accuracy and future forecasting."
         )
 
-        for _, rr in won_zero_df.sort_values("Amount", ascending=False).head(20).iterrows():
-            won_zero_bullets.append(
-                f"{rr.get('Opportunity Name','(No name)')} (ID {rr.get('Opportunity ID','')}) — "
-                f"Owner: {rr.get('Opportunity Owner','')}, Stage: {rr.get('Stage','')}, "
-                f"Amount: ${rr.get('Amount',0):,.0f}"
-            )
+        won_zero_top = won_zero_df.nlargest(20, "Amount")
+        won_zero_bullets = (
+            won_zero_top["Opportunity Name"].astype(str) + " (ID " + won_zero_top["Opportunity ID"] + ") — "
+            + "Owner: " + won_zero_top["Opportunity Owner"].astype(str) + ", Stage: " + won_zero_top["Stage"].astype(str)
+            + ", Amount: " + won_zero_top["Amount"].map("${:,.0f}".format)
+        ).tolist()
 
         for b in won_zero_bullets:
             st.markdown(f"• {b}")
@@ -1438,26 +1709,21 @@ if opps_file and roles_file:
             ["Open Pipeline at Risk (0–1 roles)", fmt_money(open_pipeline_risk)],
             ["% of Open Opps Missing Contacts", f"{risk_pct:.1%} ({open_opps_risk:,} of {open_opps_total:,})"],
         ],
-        simulator_title: [
-            ["Target Avg Contacts (Open)", f"{target_contacts:.1f} (bucket {target_bucket})"],
-            ["Modeled Win Rate at Target", f"{target_wr:.1%} (CI {target_ci_low:.1%}–{target_ci_high:.1%})"],
-            ["Current Stage-weighted Expected Won Pipeline", fmt_money(current_expected_weighted)],
-            ["Incremental Stage-weighted Won Pipeline", f"{fmt_money(inc_weighted)} (range {fmt_money(inc_low)}–{fmt_money(inc_high)})"],
-            ["Incremental if Fix Top N Deals", f"N={fix_n}: {fmt_money(tactical_inc)} (range {fmt_money(tactical_inc_low)}–{fmt_money(tactical_inc_high)})"],
-        ],
+        simulator_title: simulator_pdf_rows,
     }
 
     if gate_roll is not None:
         gate_rows_pdf = []
-        for _, rr in gate_roll.iterrows():
-            bucket = rr["Stage Bucket"]
-            gate_val = int(rr["Gate Value"])
-            opp_cov = rr["Opp Coverage %"]
-            pipe_cov = rr["Pipeline Coverage %"]
-            opp_meet = int(rr["Opps_Meeting_Gate"])
-            opp_tot = int(rr["Opps"])
-            pipe_meet = rr["Pipeline_Meeting_Gate"]
-            pipe_tot = rr["Pipeline"]
+        for bucket, gate_val, opp_cov, pipe_cov, opp_meet, opp_tot, pipe_meet, pipe_tot in zip(
+            gate_roll["Stage Bucket"],
+            gate_roll["Gate Value"].astype(int),
+            gate_roll["Opp Coverage %"],
+            gate_roll["Pipeline Coverage %"],
+            gate_roll["Opps_Meeting_Gate"].astype(int),
+            gate_roll["Opps"].astype(int),
+            gate_roll["Pipeline_Meeting_Gate"],
+            gate_roll["Pipeline"],
+        ):
             gate_rows_pdf.append([
                 f"{bucket} Opp Coverage % (gate {gate_val})",
                 f"{opp_cov:.0%} ({opp_meet}/{opp_tot})"
@@ -1468,60 +1734,22 @@ if opps_file and roles_file:
             ])
         metrics_dict["Stage Coverage Gates"] = gate_rows_pdf
 
-    chart_pngs = []
-
-    fig1, ax1 = plt.subplots(figsize=(7, 3.2))
-    ax1.plot(winrate_bucket["Winrate Bucket"], winrate_bucket["Win Rate"], marker="o")
-    ax1.yaxis.set_major_formatter(PercentFormatter(1.0))
-    ax1.set_title("Win rate by Contact Roles")
-    ax1.set_xlabel("Contact Roles per Opportunity")
-    ax1.set_ylabel("Win Rate")
-    chart_pngs.append(fig_to_png_bytes(fig1))
-
-    fig2, ax2 = plt.subplots(figsize=(7, 3.2))
-    ax2.bar(open_pipeline_bucket["Open Coverage Bucket"], open_pipeline_bucket["Open Pipeline"])
-    ax2.set_title("Open Pipeline by Coverage Bucket")
-    ax2.set_xlabel("Coverage Bucket")
-    ax2.set_ylabel("Pipeline ($)")
-    chart_pngs.append(fig_to_png_bytes(fig2))
-
-    fig3, ax3 = plt.subplots(figsize=(7, 3.2))
-    ax3.barh(funnel_counts["Coverage Funnel Bucket"], funnel_counts["Open Opps"])
-    ax3.set_title("Open Opportunities Coverage Funnel")
-    ax3.set_xlabel("# Open Opps")
-    chart_pngs.append(fig_to_png_bytes(fig3))
-
-    fig4, ax4 = plt.subplots(figsize=(7, 3.2))
-    for sg in avg_days_bucket["Stage Group"].unique():
-        sub = avg_days_bucket[avg_days_bucket["Stage Group"] == sg]
-        ax4.plot(sub["Contact Bucket"], sub["Avg Days"], marker="o", label=sg)
-    ax4.set_title("Time to Close vs Contact Roles")
-    ax4.set_xlabel("Contact Roles Bucket")
-    ax4.set_ylabel("Avg Days")
-    ax4.legend()
-    chart_pngs.append(fig_to_png_bytes(fig4))
-
-    fig5, ax5 = plt.subplots(figsize=(7, 3.2))
     stage_health = heat_counts.groupby("Stage Bucket")["Pct"].mean().reindex(["Early","Mid","Late","Open"]).fillna(0)
-    ax5.bar(stage_health.index, stage_health.values)
-    ax5.yaxis.set_major_formatter(PercentFormatter(1.0))
-    ax5.set_title("Avg Coverage Health by Stage Bucket")
-    ax5.set_ylabel("% with 2+ roles")
-    chart_pngs.append(fig_to_png_bytes(fig5))
-
-    pdf_bytes = build_pdf_report(
-        metrics_dict=metrics_dict,
-        bullets=[re.sub(r"\*\*(.*?)\*\*", r"\1", b) for b in bullets],
-        enhancements=recommendations,
-        chart_pngs=chart_pngs,
-        won_zero_rows=won_zero_bullets,
-        owner_bullets=owner_bullets_pdf,
-        priority_bullets=priority_bullets
-    )
+    chart_data = pdf_chart_series(winrate_bucket, open_pipeline_bucket, funnel_counts, avg_days_bucket, stage_health)
+    pdf_bullets = [re.sub(r"\*\*(.*?)\*\*", r"\1", b) for b in bullets]
 
+    # The PDF (charts included) is only built when the button is clicked, then cached per report content
     st.download_button(
         "⬇️ Download PDF (Branded Report)",
-        data=pdf_bytes,
+        data=lambda: make_pdf_report(
+            metrics_dict=metrics_dict,
+            bullets=pdf_bullets,
+            enhancements=recommendations,
+            chart_data=chart_data,
+            won_zero_rows=won_zero_bullets,
+            owner_bullets=owner_bullets_pdf,
+            priority_bullets=priority_bullets
+        ),
         file_name="RevOps_Global_CRM_ContactRole_Insights.pdf",
         mime="application/pdf"
     )